@@ -1,9 +1,11 @@
 #!/usr/bin/env python
 # coding:utf-8
 
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from threading import Lock
+import numpy as np
 import pandas as pd
-from datetime import datetime, timezone
 
 
 from interfaces.calculator import ICalculator
@@ -68,6 +70,31 @@ STRATEGIES = {
 }
 ## AAA calculation ponderation matching to common strategies
 #-----------------------------------------------------------------------------------------------
+## Score to letter grade lookup table, thresholds are the lower bound of each grade above 'F'
+_GRADE_THRESHOLDS = np.array([0.77, 1.54, 2.31, 3.08, 3.85, 4.61, 5.38, 6.15, 6.92, 7.69, 8.46, 9.23])
+_GRADE_LABELS = np.array(['F', 'D-', 'D', 'D+', 'C-', 'C', 'C+', 'B-', 'B', 'B+', 'A-', 'A', 'A+'])
+_GRADE_DTYPE = pd.CategoricalDtype(categories=_GRADE_LABELS, ordered=True)
+## Score to letter grade lookup table
+#-----------------------------------------------------------------------------------------------
+## Metrics used by AAA categories (metric -> ponderation key), with their score/grade column names built once
+METRIC_GROUPS = {
+    'valuation': {'fwd_p_e': 'fwd_pe', 'peg': 'peg', 'p_s': 'ps', 'p_b': 'pb', 'p_fcf': 'pfcf'},
+    'profitability': {'profit_m': 'profit_margin', 'oper_m': 'operating_magin', 'gross_m': 'gross_margin',
+                      'roe': 'roe', 'roa': 'roa'},
+    'growth': {'eps_this_y': 'eps_this_y', 'eps_next_y': 'eps_next_y', 'eps_next_5y': 'eps_next_5y',
+               'sales_q_q': 'sales_qq', 'eps_q_q': 'eps_qq'},
+    'performance': {'perf_month': 'perf_month', 'perf_quart': 'perf_quarter', 'perf_half': 'perf_half_year',
+                    'perf_year': 'perf_year', 'perf_ytd': 'perf_ytd', 'volatility_m': 'volatility'}
+}
+VALUATION_METRICS = list(METRIC_GROUPS['valuation'])
+ALL_METRICS = [metric for metrics in METRIC_GROUPS.values() for metric in metrics]
+SCORE_COLS = {m: f"score - {m}" for m in ALL_METRICS}
+GRADE_COLS = {m: f"AAA - {m.lower()}" for m in ALL_METRICS}
+ALL_SCORE_COLS = [SCORE_COLS[m] for m in ALL_METRICS]
+PONDERATION_KEYS = {m: key for metrics in METRIC_GROUPS.values() for m, key in metrics.items()}
+CATEGORY_MEMBERS = np.array([[m in metrics for metrics in METRIC_GROUPS.values()] for m in ALL_METRICS])
+## Metrics used by AAA categories
+#-----------------------------------------------------------------------------------------------
 
 
 
@@ -82,6 +109,11 @@ class AAACalculator(ICalculator):
     def __init__(self, config: object, logger: object, name: Optional[str] = None):
         super().__init__(config, logger, name)
         self.ponderation = None
+        self.max_workers = 8
+        # Saver and backup each hold a single DB connection, their writes must not interleave between
+        # threads. Separate locks let one job save while the next one is backed up.
+        self._backup_lock = Lock()
+        self._save_lock = Lock()
     
     #-----------------------------------------------------------------------------------------------
     def run_complete_calculation(self, data_source: IDataSource, data_saver: IDataSaver, 
@@ -98,30 +130,35 @@ class AAACalculator(ICalculator):
             for ratio, ponderation in weighted_ratios.items():
                 self.ponderation[ratio] = float(ponderation)
         
-        self.logger.info("{0} : starting complete AAA calculation process, with AAA calculation strategy : {1}".format(self.Name, calcualation_strategy))
+        self.logger.info("%s : starting complete AAA calculation process, with AAA calculation strategy : %s", self.Name, calcualation_strategy)
         
         try:
-            # Step 1: Calculate for sectors
-            sector_errors = self._calculate_for_sectors(data_source, data_saver, data_backup, sources)
-            errors.extend([f"Sector error: {err}" for err in sector_errors])
-            
-            # Step 2: Calculate for indexes
-            index_errors = self._calculate_for_indexes(data_source, data_saver, data_backup)
-            errors.extend([f"Index error: {err}" for err in index_errors])
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # Step 1: Submit calculation for sectors
+                future_to_job = self._calculate_for_sectors(executor, data_source, data_saver, data_backup, sources)
+                
+                # Step 2: Submit calculation for indexes
+                future_to_job.update(self._calculate_for_indexes(executor, data_source, data_saver, data_backup))
+                
+                # Step 3: Submit calculation for all data
+                future_to_job.update(self._calculate_for_all(executor, data_source, data_saver, data_backup))
+                
+                # Collect results as they complete
+                for future in as_completed(future_to_job):
+                    if future.result():
+                        self.logger.info("%s : AAA calculation for %s completed", self.Name, future_to_job[future][1])
             
-            # Step 3: Calculate for all data
-            all_success = self._calculate_for_all(data_source, data_saver, data_backup)
-            if not all_success:
-                errors.append("All data calculation failed")
+            # Report errors in submission order
+            errors.extend([error for future, (error, _) in future_to_job.items() if not future.result()])
             
             if errors:
-                self.logger.error("{0} : AAA calculation completed with {1} errors".format(self.Name, len(errors)))
+                self.logger.error("%s : AAA calculation completed with %s errors", self.Name, len(errors))
             else:
-                self.logger.info("{0} : AAA calculation completed successfully".format(self.Name))
+                self.logger.info("%s : AAA calculation completed successfully", self.Name)
                 
         except Exception as e:
             error_msg = f"Complete AAA calculation failed: {str(e)}"
-            self.logger.error("{0} : {1}".format(self.Name, error_msg))
+            self.logger.error("%s : %s", self.Name, error_msg)
             errors.append(error_msg)
         
         return errors
@@ -134,7 +171,7 @@ class AAACalculator(ICalculator):
             import pandas as pd
             return True
         except Exception as e:
-            self.logger.error("{0} : health check failed - {1}".format(self.Name, str(e)))
+            self.logger.error("%s : health check failed - %s", self.Name, e)
             return False
         
     #-----------------------------------------------------------------------------------------------
@@ -150,60 +187,45 @@ class AAACalculator(ICalculator):
         return ["SnP500", "MegaCap", "LargeCap", "MidCap", "SmallCap", "MicroCap"]
     
     #-----------------------------------------------------------------------------------------------
-    def _calculate_for_sectors(self, data_source: IDataSource, data_saver: IDataSaver, 
-                             data_backup: IDataBackup, sectors: Optional[List[str]] = None) -> List[str]:
-        """Calculate AAA ratings for multiple sectors"""
-        errors = []
-        
+    def _calculate_for_sectors(self, executor: ThreadPoolExecutor, data_source: IDataSource, data_saver: IDataSaver, 
+                             data_backup: IDataBackup, sectors: Optional[List[str]] = None) -> Dict[Future, Tuple[str, str]]:
+        """Submit AAA ratings calculation for multiple sectors"""
         if sectors is None:
             sectors = self._get_fa_sectors()
         
+        future_to_job = {}
         for sector in sectors:
             source = f"AAA - {sector}.csv"
             destination = f"AAA_{sector}"
             
-            success = self._calculate_and_save(data_source, data_saver, data_backup, source, destination)
-            if not success:
-                errors.append(f"Sector {sector}")
-            else:
-                self.logger.info("{0} : AAA calculation for sector '{1}' completed at {2}".format(
-                    self.Name, sector, datetime.now(timezone.utc).isoformat()))
+            future = executor.submit(self._calculate_and_save, data_source, data_saver, data_backup, source, destination)
+            future_to_job[future] = (f"Sector error: Sector {sector}", f"sector '{sector}'")
         
-        return errors
+        return future_to_job
     
     #-----------------------------------------------------------------------------------------------
-    def _calculate_for_indexes(self, data_source: IDataSource, data_saver: IDataSaver, 
-                             data_backup: IDataBackup) -> List[str]:
-        """Calculate AAA ratings for indexes"""
-        errors = []
-        indexes = self._get_indexes()
-        
-        for index in indexes:
+    def _calculate_for_indexes(self, executor: ThreadPoolExecutor, data_source: IDataSource, data_saver: IDataSaver, 
+                             data_backup: IDataBackup) -> Dict[Future, Tuple[str, str]]:
+        """Submit AAA ratings calculation for indexes"""
+        future_to_job = {}
+        for index in self._get_indexes():
             source = f"AAA - {index}.csv"
             destination = f"AAA_{index}"
             
-            success = self._calculate_and_save(data_source, data_saver, data_backup, source, destination)
-            if not success:
-                errors.append(f"Index {index}")
-            else:
-                self.logger.info("{0} : AAA calculation for index '{1}' completed at {2}".format(
-                    self.Name, index, datetime.now(timezone.utc).isoformat()))
+            future = executor.submit(self._calculate_and_save, data_source, data_saver, data_backup, source, destination)
+            future_to_job[future] = (f"Index error: Index {index}", f"index '{index}'")
         
-        return errors
+        return future_to_job
     
     #-----------------------------------------------------------------------------------------------
-    def _calculate_for_all(self, data_source: IDataSource, data_saver: IDataSaver, 
-                         data_backup: IDataBackup) -> bool:
-        """Calculate AAA ratings for all data"""
+    def _calculate_for_all(self, executor: ThreadPoolExecutor, data_source: IDataSource, data_saver: IDataSaver, 
+                         data_backup: IDataBackup) -> Dict[Future, Tuple[str, str]]:
+        """Submit AAA ratings calculation for all data"""
         source = "AAA - all.csv"
         destination = "AAA_all"
         
-        success = self._calculate_and_save(data_source, data_saver, data_backup, source, destination)
-        if success:
-            self.logger.info("{0} : AAA calculation for all data completed at {1}".format(
-                self.Name, datetime.now(timezone.utc).isoformat()))
-        
-        return success
+        future = executor.submit(self._calculate_and_save, data_source, data_saver, data_backup, source, destination)
+        return {future: ("All data calculation failed", "all data")}
     
     #-----------------------------------------------------------------------------------------------
     def _calculate_and_save(self, data_source: IDataSource, data_saver: IDataSaver, 
@@ -212,237 +234,179 @@ class AAACalculator(ICalculator):
         Complete AAA calculation process with full control over saving and backup
         """
         try:
-            self.logger.info("{0} : starting AAA calculation for {1}".format(self.Name, source))
+            self.logger.info("%s : starting AAA calculation for %s", self.Name, source)
             
             # Step 1: Get data from data source
             raw_data = data_source.get_data(source)
             if raw_data.empty:
-                self.logger.error("{0} : no data found for {1}".format(self.Name, source))
+                self.logger.error("%s : no data found for %s", self.Name, source)
                 return False
             
-            # Step 2: Preprocess data
-            processed_data = raw_data.fillna(0)
+            # Step 2: Preprocess data into column arrays, scored columns are zero-filled for scaling
+            columns, score_cols = self._get_columns(raw_data)
             
             # Step 3: Calculate individual scores and grades
-            scored_data = self._set_grade(processed_data)
+            columns.update(self._set_grade(columns, score_cols))
             
             # Step 4: Perform AAA calculation
-            aaa_data = self._make_aaa_calculation(scored_data)
+            aaa_data = self._make_aaa_calculation(columns, raw_data.index)
             
             # Step 5: Create backup before saving
-            self.logger.info("{0} : creating backup for {1}".format(self.Name, destination))
-            backup_success, backup_error = data_backup.backup_data(destination)
+            with self._backup_lock:
+                self.logger.info("%s : creating backup for %s", self.Name, destination)
+                backup_success, backup_error = data_backup.backup_data(destination)
             if not backup_success:
-                self.logger.warning("{0} : backup failed for {1} - {2}".format(
-                    self.Name, destination, backup_error))
+                self.logger.warning("%s : backup failed for %s - %s",
+                    self.Name, destination, backup_error)
             
             # Step 6: Save results
-            self.logger.info("{0} : saving AAA results to {1}".format(self.Name, destination))
-            save_success = data_saver.save_data(aaa_data, destination)
+            with self._save_lock:
+                self.logger.info("%s : saving AAA results to %s", self.Name, destination)
+                save_success = data_saver.save_data(aaa_data, destination)
             
             if save_success:
-                self.logger.info("{0} : AAA calculation completed successfully for {1}".format(
-                    self.Name, source))
+                self.logger.info("%s : AAA calculation completed successfully for %s",
+                    self.Name, source)
                 return True
             else:
-                self.logger.error("{0} : failed to save AAA results for {1}".format(
-                    self.Name, destination))
+                self.logger.error("%s : failed to save AAA results for %s",
+                    self.Name, destination)
                 return False
                 
         except Exception as e:
-            self.logger.error("{0} : AAA calculation failed for {1} - {2}".format(
-                self.Name, source, str(e)))
+            self.logger.error("%s : AAA calculation failed for %s - %s",
+                self.Name, source, e)
             return False
     
     #-----------------------------------------------------------------------------------------------
-    def _set_grade(self, df_tickers_sector: pd.DataFrame) -> pd.DataFrame:
-        """Calculate individual metric scores and grades"""
-        valuation_metrics = ['fwd_p_e', 'peg', 'p_s', 'p_b', 'p_fcf']
-        # Calculate scores for numeric columns
-        for column in df_tickers_sector.select_dtypes(include=['float']):
-            if column not in ['_saved_timestamp', '_backup_timestamp']:
-                if column in valuation_metrics:
-                    # INVERT: Lower ratios = Higher scores
-                    df_tickers_sector[f"score - {column}"] = 10 - self._scale_to_10(
-                        df_tickers_sector[column],
-                        df_tickers_sector[column].min(skipna=True),
-                        df_tickers_sector[column].max(skipna=True)
-                    )
-                else:
-                    df_tickers_sector[f"score - {column.lower()}"] = self._scale_to_10(
-                        df_tickers_sector[column],
-                        df_tickers_sector[column].min(skipna=True),
-                        df_tickers_sector[column].max(skipna=True)
-                    )
-        
-        # Convert scores to grades
-        for column in df_tickers_sector.columns:
-            if column.startswith("score - "):
-                grade_col = f"AAA - {column.replace('score - ', '').lower()}"
-                df_tickers_sector[grade_col] = df_tickers_sector[column].apply(self._convert_to_grade)
-        
-        return df_tickers_sector
+    def _get_columns(self, df_tickers: pd.DataFrame) -> Tuple[Dict[str, Any], List[str]]:
+        """Split data into a column dict and the list of columns to score, those are zero-filled float arrays.
+        Scored columns are the AAA metrics plus the other float columns (price, market cap, ...)."""
+        columns = dict(df_tickers.items())
+        score_cols = [column for column, values in columns.items()
+                      if column in SCORE_COLS or (values.dtype.kind == 'f' and column not in ('_saved_timestamp', '_backup_timestamp'))]
+        for column in score_cols:
+            columns[column] = np.nan_to_num(columns[column].to_numpy(dtype=float), nan=0.0)
+        return columns, score_cols
     
     #-----------------------------------------------------------------------------------------------
-    def _make_aaa_calculation(self, df_tickers: pd.DataFrame) -> pd.DataFrame:
-        """Perform complete AAA calculation"""
-        df_tickers = self._set_valuation_grade(df_tickers=df_tickers,
-                                               fwd_pe_ponderation=self.ponderation.get('fwd_pe', 1),
-                                               peg_ponderation=self.ponderation.get('peg', 1),
-                                               ps_ponderation=self.ponderation.get('ps', 1),
-                                               pb_ponderation=self.ponderation.get('pb', 1),
-                                               pfcf_ponderation=self.ponderation.get('pfcf', 1))
-        df_tickers = self._set_profitability_grade(df_tickers=df_tickers,
-                                                   profit_margin_ponderation=self.ponderation.get('profit_margin', 1),
-                                                   operating_margin_ponderation=self.ponderation.get('operating_magin', 1),
-                                                   gross_margin_ponderation=self.ponderation.get('gross_margin', 1),
-                                                   roe_ponderation=self.ponderation.get('roe', 1),
-                                                   roa_ponderation=self.ponderation.get('roa', 1),)
-        df_tickers = self._set_growth_grade(df_tickers=df_tickers, 
-                                            eps_this_y_ponderation=self.ponderation.get('eps_this_y', 1),
-                                            eps_next_y_ponderation=self.ponderation.get('eps_next_y', 1),
-                                            eps_next_5y_ponderation=self.ponderation.get('eps_next_5y', 1),
-                                            sales_qq_ponderation=self.ponderation.get('sales_qq', 1),
-                                            eps_qq_ponderation=self.ponderation.get('eps_qq', 1))
-        df_tickers = self._set_performance_grade(df_tickers=df_tickers, 
-                                                 perf_month_ponderation=self.ponderation.get('perf_month', 1),
-                                                 perf_quarter_ponderation=self.ponderation.get('perf_quarter', 1),
-                                                 perf_half_year_ponderation=self.ponderation.get('perf_half_year', 1),
-                                                 perf_year_ponderation=self.ponderation.get('perf_year', 1),
-                                                 perf_ytd_ponderation=self.ponderation.get('perf_ytd', 1))
-        df_tickers = self._set_overall_rating(df_tickers=df_tickers, 
-                                              val_grade_ponderation=self.ponderation['valuation'],
-                                              prof_grade_ponderation=self.ponderation['profitability'],
-                                              grow_grade_ponderation=self.ponderation['growth'],
-                                              perf_grade_ponderation=self.ponderation['performance'])
-        return df_tickers
+    def _set_grade(self, columns: Dict[str, Any], score_cols: List[str]) -> Dict[str, Any]:
+        """Calculate individual metric scores and grades, returned as new columns"""
+        new_cols = {}
+        
+        # Calculate scores and grades for the scored columns in a single pass over their block
+        if score_cols:
+            block = np.column_stack([columns[column] for column in score_cols])
+            mn = np.nanmin(block, axis=0)
+            mx = np.nanmax(block, axis=0)
+            
+            # Constant columns (e.g. zero-filled sparse metrics) are not scaled, they get a shared neutral score
+            constant = mn == mx
+            if constant.any():
+                self.logger.debug("%s : constant columns get a neutral score - %s",
+                    self.Name, [column for column, const in zip(score_cols, constant) if const])
+            neutral_score = np.full(len(block), 5.0)
+            neutral_grade = self._convert_to_grade(neutral_score)
+            
+            varying = ~constant
+            scaled = (block[:, varying] - mn[varying]) / (mx[varying] - mn[varying]) * 10.0
+            # INVERT: Lower ratios = Higher scores
+            val_mask = np.isin(score_cols, VALUATION_METRICS)[varying]
+            scaled[:, val_mask] = 10.0 - scaled[:, val_mask]
+            
+            scores = [neutral_score] * len(score_cols)
+            grades = [neutral_grade] * len(score_cols)
+            for i, j in enumerate(np.flatnonzero(varying)):
+                scores[j] = scaled[:, i]
+                grades[j] = self._convert_to_grade(scaled[:, i])
+            
+            for column, score in zip(score_cols, scores):
+                new_cols[SCORE_COLS.get(column, f"score - {column.lower()}")] = score
+            for column, grade in zip(score_cols, grades):
+                new_cols[GRADE_COLS.get(column, f"AAA - {column.lower()}")] = grade
+        
+        return new_cols
     
     #-----------------------------------------------------------------------------------------------
-    def _set_valuation_grade(self, df_tickers: pd.DataFrame, fwd_pe_ponderation: float = 1, 
-                           peg_ponderation: float = 1, ps_ponderation: float = 1, 
-                           pb_ponderation: float = 1, pfcf_ponderation: float = 1) -> pd.DataFrame:
-        """Calculate valuation grade"""
-        df_tickers["score - valuation"] = (
-            df_tickers['score - fwd_p_e'] * fwd_pe_ponderation +
-            df_tickers['score - peg'] * peg_ponderation +
-            df_tickers['score - p_s'] * ps_ponderation +
-            df_tickers['score - p_b'] * pb_ponderation +
-            df_tickers['score - p_fcf'] * pfcf_ponderation
-        )
-        
-        df_tickers["score - valuation"] = 10 - self._scale_to_10(
-            df_tickers["score - valuation"], 
-            df_tickers["score - valuation"].min(skipna=True), 
-            df_tickers["score - valuation"].max(skipna=True)
-        )
-        df_tickers["AAA - valuation"] = df_tickers["score - valuation"].apply(self._convert_to_grade)
-        return df_tickers
+    def _make_aaa_calculation(self, columns: Dict[str, Any], index: pd.Index) -> pd.DataFrame:
+        """Perform complete AAA calculation, the result DataFrame is built once from the column dict"""
+        columns.update(self._set_category_grades(scores=columns))
+        columns.update(self._set_overall_rating(scores=columns, 
+                                                val_grade_ponderation=self.ponderation['valuation'],
+                                                prof_grade_ponderation=self.ponderation['profitability'],
+                                                grow_grade_ponderation=self.ponderation['growth'],
+                                                perf_grade_ponderation=self.ponderation['performance']))
+        return pd.DataFrame(columns, index=index)
     
     #-----------------------------------------------------------------------------------------------
-    def _set_profitability_grade(self, df_tickers: pd.DataFrame, profit_margin_ponderation: float = 1,
-                               operating_margin_ponderation: float = 1, gross_margin_ponderation: float = 1,
-                               roe_ponderation: float = 1, roa_ponderation: float = 1) -> pd.DataFrame:
-        """Calculate profitability grade"""
-        df_tickers["score - profitability"] = (
-            df_tickers['score - profit_m'] * profit_margin_ponderation +
-            df_tickers['score - oper_m'] * operating_margin_ponderation +
-            df_tickers['score - gross_m'] * gross_margin_ponderation +
-            df_tickers['score - roe'] * roe_ponderation +
-            df_tickers['score - roa'] * roa_ponderation
-        )
-        
-        df_tickers["score - profitability"] = self._scale_to_10(
-            df_tickers["score - profitability"],
-            df_tickers["score - profitability"].min(skipna=True),
-            df_tickers["score - profitability"].max(skipna=True)
-        )
-        df_tickers["AAA - profitability"] = df_tickers["score - profitability"].apply(self._convert_to_grade)
-        return df_tickers
+    def _get_category_weights(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Build the (metrics, categories) weight matrix from metric ponderations, and its membership mask"""
+        ponderations = np.array([self.ponderation.get(PONDERATION_KEYS[metric], 1) for metric in ALL_METRICS], dtype=float)
+        return CATEGORY_MEMBERS * ponderations[:, None], CATEGORY_MEMBERS
     
     #-----------------------------------------------------------------------------------------------
-    def _set_growth_grade(self, df_tickers: pd.DataFrame, eps_this_y_ponderation: float = 1,
-                         eps_next_y_ponderation: float = 1, eps_next_5y_ponderation: float = 1,
-                         sales_qq_ponderation: float = 1, eps_qq_ponderation: float = 1) -> pd.DataFrame:
-        """Calculate growth grade"""
-        df_tickers["score - growth"] = (
-            df_tickers['score - eps_this_y'] * eps_this_y_ponderation +
-            df_tickers['score - eps_next_y'] * eps_next_y_ponderation +
-            df_tickers['score - eps_next_5y'] * eps_next_5y_ponderation +
-            df_tickers['score - sales_q_q'] * sales_qq_ponderation +
-            df_tickers['score - eps_q_q'] * eps_qq_ponderation
-        )
-        
-        df_tickers["score - growth"] = self._scale_to_10(
-            df_tickers["score - growth"],
-            df_tickers["score - growth"].min(skipna=True),
-            df_tickers["score - growth"].max(skipna=True)
-        )
-        df_tickers["AAA - growth"] = df_tickers["score - growth"].apply(self._convert_to_grade)
-        return df_tickers
+    def _category_sums(self, score_matrix: np.ndarray, weights: np.ndarray, members: np.ndarray) -> np.ndarray:
+        """Weighted sum of member metric scores per category"""
+        raw = np.nan_to_num(score_matrix) @ weights
+        # NaN scores only propagate to the categories the metric belongs to
+        raw[np.isnan(score_matrix) @ members] = np.nan
+        return raw
     
     #-----------------------------------------------------------------------------------------------
-    def _set_performance_grade(self, df_tickers: pd.DataFrame, perf_month_ponderation: float = 1,
-                             perf_quarter_ponderation: float = 1, perf_half_year_ponderation: float = 1,
-                             perf_year_ponderation: float = 1, perf_ytd_ponderation: float = 1,
-                             volatility_ponderation: float = 1) -> pd.DataFrame:
-        """Calculate performance grade"""
-        df_tickers["score - performance"] = (
-            df_tickers['score - perf_month'] * perf_month_ponderation +
-            df_tickers['score - perf_quart'] * perf_quarter_ponderation +
-            df_tickers['score - perf_half'] * perf_half_year_ponderation +
-            df_tickers['score - perf_year'] * perf_year_ponderation +
-            df_tickers['score - perf_ytd'] * perf_ytd_ponderation +
-            df_tickers['score - volatility_m'] * volatility_ponderation
-        )
+    def _set_category_grades(self, scores: Dict[str, Any]) -> Dict[str, Any]:
+        """Calculate valuation, profitability, growth and performance grades with one weighted sum"""
+        categories = list(METRIC_GROUPS)
+        score_matrix = np.column_stack([scores[score_col] for score_col in ALL_SCORE_COLS])
+        category_scores = self._scale_columns_to_10(self._category_sums(score_matrix, *self._get_category_weights()))
+        # Valuation metric scores are already inverted, the category score is flipped back
+        val_idx = categories.index('valuation')
+        category_scores[:, val_idx] = 10 - category_scores[:, val_idx]
         
-        df_tickers["score - performance"] = self._scale_to_10(
-            df_tickers["score - performance"],
-            df_tickers["score - performance"].min(skipna=True),
-            df_tickers["score - performance"].max(skipna=True)
-        )
-        df_tickers["AAA - performance"] = df_tickers["score - performance"].apply(self._convert_to_grade)
-        return df_tickers
+        category_cols = {}
+        for j, category in enumerate(categories):
+            category_cols[f"score - {category}"] = category_scores[:, j]
+            category_cols[f"AAA - {category}"] = self._convert_to_grade(category_scores[:, j])
+        return category_cols
     
     #-----------------------------------------------------------------------------------------------
-    def _set_overall_rating(self, df_tickers: pd.DataFrame, val_grade_ponderation: float = 1,
+    def _set_overall_rating(self, scores: Dict[str, Any], val_grade_ponderation: float = 1,
                           prof_grade_ponderation: float = 1, grow_grade_ponderation: float = 1,
-                          perf_grade_ponderation: float = 1) -> pd.DataFrame:
+                          perf_grade_ponderation: float = 1) -> Dict[str, Any]:
         """Calculate overall rating"""
-        df_tickers["score - overall"] = (
-            df_tickers["score - valuation"] * val_grade_ponderation +
-            df_tickers['score - profitability'] * prof_grade_ponderation +
-            df_tickers['score - growth'] * grow_grade_ponderation +
-            df_tickers['score - performance'] * perf_grade_ponderation
+        score = (
+            scores["score - valuation"] * val_grade_ponderation +
+            scores['score - profitability'] * prof_grade_ponderation +
+            scores['score - growth'] * grow_grade_ponderation +
+            scores['score - performance'] * perf_grade_ponderation
         )
         
-        df_tickers["score - overall"] = self._scale_to_10(
-            df_tickers["score - overall"],
-            df_tickers["score - overall"].min(skipna=True),
-            df_tickers["score - overall"].max(skipna=True)
-        )
-        df_tickers["AAA - overall"] = df_tickers["score - overall"].apply(self._convert_to_grade)
-        return df_tickers
+        score = self._scale_to_10(score, np.nanmin(score), np.nanmax(score))
+        return {"score - overall": score, "AAA - overall": self._convert_to_grade(score)}
+    
+    #-----------------------------------------------------------------------------------------------
+    def _convert_to_grade(self, vals: Union[float, np.ndarray]) -> Union[str, pd.Categorical]:
+        """Convert numerical scores to ordered letter grades (NaN scores get 'F'), a single score gives its letter"""
+        if np.ndim(vals) == 0:
+            return 'F' if np.isnan(vals) else str(_GRADE_LABELS[np.searchsorted(_GRADE_THRESHOLDS, vals, side='right')])
+        vals = np.asarray(vals, dtype=float)
+        codes = np.searchsorted(_GRADE_THRESHOLDS, vals, side='right')
+        codes[np.isnan(vals)] = 0
+        return pd.Categorical.from_codes(codes, dtype=_GRADE_DTYPE)
     
     #-----------------------------------------------------------------------------------------------
-    def _convert_to_grade(self, num: float) -> str:
-        """Convert numerical score to letter grade"""
-        if num >= 9.23: return 'A+'
-        elif num >= 8.46: return 'A'
-        elif num >= 7.69: return 'A-'
-        elif num >= 6.92: return 'B+'
-        elif num >= 6.15: return 'B'
-        elif num >= 5.38: return 'B-'
-        elif num >= 4.61: return 'C+'
-        elif num >= 3.85: return 'C'
-        elif num >= 3.08: return 'C-'
-        elif num >= 2.31: return 'D+'
-        elif num >= 1.54: return 'D'
-        elif num >= 0.77: return 'D-'
-        else: return 'F'
+    def _scale_columns_to_10(self, arr2d: np.ndarray) -> np.ndarray:
+        """Scale each column of a 2D array to 0-10 range, constant columns get a neutral 5.0"""
+        mn = np.nanmin(arr2d, axis=0)
+        mx = np.nanmax(arr2d, axis=0)
+        rng = mx - mn
+        rng[rng == 0] = 1
+        out = (arr2d - mn) / rng * 10.0
+        out[:, (mx == mn)] = 5.0  # Neutral score for identical values
+        return out
     
     #-----------------------------------------------------------------------------------------------
-    def _scale_to_10(self, val: float, mine: float, maxe: float) -> float:
-        """Scale value to 0-10 range"""
+    def _scale_to_10(self, val: np.ndarray, mine: float, maxe: float) -> np.ndarray:
+        """Scale values to 0-10 range"""
         if maxe == mine:
-            return 5.0  # Neutral score for identical values
+            return np.full_like(val, 5.0, dtype=float)  # Neutral score for identical values
         return (val - mine) / (maxe - mine) * 10.0